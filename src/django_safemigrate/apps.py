@@ -1,7 +1,32 @@
 """Add a safemigrate command."""
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
 from django.utils.translation import gettext_lazy as _
 
+from django_safemigrate.mode import (
+    NONE_DEPRECATED_HINT,
+    NONE_DEPRECATED_MESSAGE,
+    get_mode,
+)
+
+
+def check_mode(app_configs, **kwargs):
+    """Fail fast at startup if the SAFEMIGRATE setting is invalid."""
+    if getattr(settings, "SAFEMIGRATE", "strict") is None:
+        return [
+            checks.Warning(
+                NONE_DEPRECATED_MESSAGE,
+                hint=NONE_DEPRECATED_HINT,
+                id="django_safemigrate.W001",
+            )
+        ]
+    try:
+        get_mode()
+    except ValueError as e:
+        return [checks.Error(str(e), id="django_safemigrate.E001")]
+    return []
+
 
 class SafeMigrateConfig(AppConfig):
     """Safe migrate Django app config."""
@@ -9,3 +34,6 @@ class SafeMigrateConfig(AppConfig):
     name = "django_safemigrate"
     verbose_name = _("Safe Migrate")
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        checks.register(check_mode)
@@ -5,14 +5,12 @@ Migration safety is enforced by a pre_migrate signal receiver.
 
 from __future__ import annotations
 
-from collections.abc import Collection
+from collections import deque
 from functools import cached_property
-from enum import Enum
-import warnings
 
-from django.conf import settings
 from django.core.management.base import CommandError
 from django.core.management.commands import migrate
+from django.db import transaction
 from django.db.migrations import Migration
 from django.db.models.signals import pre_migrate
 from django.db.utils import OperationalError
@@ -20,26 +18,11 @@ from django.utils import timezone
 from django.utils.timesince import timeuntil
 
 from django_safemigrate import Safe, When
+from django_safemigrate.mode import Mode, get_mode
 from django_safemigrate.models import SafeMigration
 
-
-class Mode(Enum):
-    """The mode of operation for safemigrate.
-
-    STRICT, the default mode, will throw an error if migrations
-    marked Safe.before_deploy() are blocked by unrun migrations that
-    are marked Safe.after_deploy() with an unfulfilled delay.
-
-    NONSTRICT will run the same migrations as strict mode, but will
-    not throw an error if migrations are blocked.
-
-    DISABLED will completely bypass safemigrate protections and run
-    exactly the same as the standard migrate command.
-    """
-
-    STRICT = "strict"
-    NONSTRICT = "nonstrict"
-    DISABLED = "disabled"
+# The Safe constructors that may be used uncalled for compatibility.
+SAFE_CALLABLES = frozenset({Safe.before_deploy, Safe.after_deploy, Safe.always})
 
 
 class Command(migrate.Command):
@@ -73,31 +56,38 @@ class Command(migrate.Command):
             return  # Only run once
         self.receiver_has_run = True
 
-        if self.mode == Mode.DISABLED:
+        if self.mode is Mode.DISABLED:
             return  # Run migrate normally
 
         if any(backward for _, backward in plan):
             raise CommandError("Backward migrations are not supported.")
 
+        if not plan:
+            return  # Nothing to migrate
+
+        # Keep the migrations in the order of the original plan
+        ordered = [migration for migration, _ in plan]
+
         # Resolve the declared safety configuration of each migration
-        declared = {migration: self.safe(migration) for migration, _ in plan}
+        declared = {migration: self.safe(migration) for migration in ordered}
 
         # Get the dates of when migrations were detected
         detected = self.detected(declared)
 
         # Resolve the current status for each migration respecting delays
-        resolved = self.resolve(declared, detected)
+        now = timezone.now()
+        resolved = self.resolve(declared, detected, now)
 
         # Categorize the migrations for display and action
-        ready, delayed, blocked = self.categorize(resolved)
+        ready, delayed, blocked = self.categorize(ordered, resolved)
 
         if delayed:
-            self.write_delayed(delayed, declared, resolved, detected)
+            self.write_delayed(delayed, declared, resolved, detected, now)
 
         if blocked:
             self.write_blocked(blocked)
 
-        if blocked and self.mode == Mode.STRICT:
+        if blocked and self.mode is Mode.STRICT:
             raise CommandError("Aborting due to blocked migrations.")
 
         # Mark the delayed migrations as detected
@@ -110,40 +100,22 @@ class Command(migrate.Command):
             ]
         )
 
-        # Swap out the items in the plan with the safe migrations.
-        # None are backward, so we can always set backward to False.
-        plan[:] = [(migration, False) for migration in ready]
+        # Filter the plan down to the safe migrations.
+        # None are backward, so the original entries can be kept as-is.
+        ready_set = set(ready)
+        plan[:] = [entry for entry in plan if entry[0] in ready_set]
 
     @cached_property
     def mode(self):
         """Determine the configured mode of operation for safemigrate."""
-        mode = getattr(settings, "SAFEMIGRATE", "strict")
-        if mode is None:
-            warnings.warn(
-                "Setting the SAFEMIGRATE setting to None is deprecated."
-                " Use 'strict' instead, or remove the setting to use the default.",
-                DeprecationWarning,
-            )
-            mode = "strict"
-        if not isinstance(mode, str):
-            raise ValueError(
-                "The SAFEMIGRATE setting must be a string."
-                " It must be one of 'strict', 'nonstrict', or 'disabled'."
-            )
-        try:
-            return Mode(mode.lower())
-        except ValueError:
-            raise ValueError(
-                "The SAFEMIGRATE setting is invalid."
-                " It must be one of 'strict', 'nonstrict', or 'disabled'."
-            )
+        return get_mode()
 
     @staticmethod
     def safe(migration: Migration) -> Safe:
         """Determine the safety setting of a migration."""
-        callables = [Safe.before_deploy, Safe.after_deploy, Safe.always]
         safe = getattr(migration, "safe", Safe.always)
-        safety = safe() if safe in callables else safe
+        # Safe instances aren't hashable, so only look up callables.
+        safety = safe() if callable(safe) and safe in SAFE_CALLABLES else safe
         if not isinstance(safety, Safe):
             raise CommandError(
                 f"Migration {migration.app_label}.{migration.name}"
@@ -156,17 +128,21 @@ class Command(migrate.Command):
     ) -> dict[Migration, timezone.datetime]:
         """Get the detected dates for each migration."""
         to_detect = [
-            (migration.app_label, migration.name)
+            migration
             for migration, safe in declared.items()
             if safe.when == When.AFTER_DEPLOY and safe.delay is not None
         ]
+        if not to_detect:
+            return {}  # Only delayed migrations are detected
         try:
-            detected_map = SafeMigration.objects.get_detected_map(to_detect)
+            detected_map = SafeMigration.objects.get_detected_map(
+                [(migration.app_label, migration.name) for migration in to_detect]
+            )
         except OperationalError:  # pragma: no cover
             return {}  # The table doesn't exist yet
         return {
             migration: detected_map[(migration.app_label, migration.name)]
-            for migration in declared
+            for migration in to_detect
             if (migration.app_label, migration.name) in detected_map
         }
 
@@ -174,13 +150,13 @@ class Command(migrate.Command):
         self,
         declared: dict[Migration, Safe],
         detected: dict[Migration, timezone.datetime],
+        now: timezone.datetime,
     ) -> dict[Migration, When]:
         """Resolve the current status of each migration.
 
         ``When.AFTER_DEPLOY`` migrations are resolved to ``When.ALWAYS``
         if they have previously been detected and their delay has passed.
         """
-        now = timezone.now()
         return {
             migration: (
                 When.ALWAYS
@@ -194,26 +170,29 @@ class Command(migrate.Command):
         }
 
     @staticmethod
-    def to_block(
-        target: Collection[Migration],
-        blockers: Collection[Migration],
-    ):
-        """Find a round of migrations that depend on these blockers.
+    def dependents(
+        migrations: list[Migration],
+    ) -> dict[Migration, list[Migration]]:
+        """Map each migration to the migrations that directly depend on it.
 
-        Search the target collection for migrations that depend on the
-        given set of blocker migrations.
+        A migration depends on another if it lists it in its
+        ``dependencies``, or if the other lists it in its ``run_before``.
+        Dependencies outside of the given migrations are ignored.
         """
-        blocker_deps = [(m.app_label, m.name) for m in blockers]
-        to_block_deps = [dep for m in blockers for dep in m.run_before]
-        return [
-            migration
-            for migration in target
-            if any(dep in blocker_deps for dep in migration.dependencies)
-            or (migration.app_label, migration.name) in to_block_deps
-        ]
+        by_key = {(m.app_label, m.name): m for m in migrations}
+        dependents = {migration: [] for migration in migrations}
+        for migration in migrations:
+            for dep in migration.dependencies:
+                if dep in by_key:
+                    dependents[by_key[dep]].append(migration)
+            for dep in migration.run_before:
+                if dep in by_key:
+                    dependents[migration].append(by_key[dep])
+        return dependents
 
     def categorize(
         self,
+        ordered: list[Migration],
         resolved: dict[Migration, When],
     ) -> tuple[list[Migration], list[Migration], list[Migration]]:
         """Categorize the migrations as ready, delayed, or blocked.
@@ -226,52 +205,54 @@ class Command(migrate.Command):
         Blocked migrations are dependent on a delayed migration, but
         either need to run before deployment or depend on a migration
         that needs to run before deployment.
+
+        The categories are returned in the given order.
         """
-        ready = [mig for mig, when in resolved.items() if when != When.AFTER_DEPLOY]
-        delayed = [mig for mig, when in resolved.items() if when == When.AFTER_DEPLOY]
-        blocked = []
-
-        if not delayed and not blocked:
-            return ready, delayed, blocked
-
-        # Delay or block migrations that are behind protected migrations.
-        while True:
-            block = self.to_block(ready, delayed + blocked)
-            if not block:
-                break
-
-            for migration in block:
-                ready.remove(migration)
-                if resolved[migration] == When.BEFORE_DEPLOY:
-                    blocked.append(migration)
-                else:
-                    delayed.append(migration)
-
-        # Block delayed migrations that are behind other blocked migrations.
-        while True:
-            block = self.to_block(delayed, blocked)
-            if not block:
-                break
-
-            for migration in block:
-                delayed.remove(migration)
-                blocked.append(migration)
+        state = {
+            mig: "delayed" if when == When.AFTER_DEPLOY else "ready"
+            for mig, when in resolved.items()
+        }
+        delayed = [mig for mig, category in state.items() if category == "delayed"]
+
+        if not delayed:
+            return list(ordered), [], []
+
+        # Propagate from the delayed migrations to everything behind them.
+        # A migration can only move from ready to delayed to blocked,
+        # so each is queued at most twice.
+        dependents = self.dependents(ordered)
+        queue = deque(delayed)
+        while queue:
+            migration = queue.popleft()
+            is_blocked = state[migration] == "blocked"
+            for dependent in dependents[migration]:
+                if state[dependent] == "blocked":
+                    continue
+                if is_blocked or resolved[dependent] == When.BEFORE_DEPLOY:
+                    state[dependent] = "blocked"
+                    queue.append(dependent)
+                elif state[dependent] == "ready":
+                    state[dependent] = "delayed"
+                    queue.append(dependent)
 
         # Order the migrations in the order of the original plan.
-        ready = [m for m in resolved if m in ready]
-        delayed = [m for m in resolved if m in delayed]
-        blocked = [m for m in resolved if m in blocked]
+        ready = [m for m in ordered if state[m] == "ready"]
+        delayed = [m for m in ordered if state[m] == "delayed"]
+        blocked = [m for m in ordered if state[m] == "blocked"]
 
         return ready, delayed, blocked
 
     def detect(self, migrations: list[Migration]):
         """Mark the given migrations as detected."""
+        if not migrations:
+            return
+
         # The detection datetime is what's used to determine if an
         # after_deploy() with a delay can be migrated or not.
         try:
-            for migration in migrations:
-                SafeMigration.objects.get_or_create(
-                    app=migration.app_label, name=migration.name
+            with transaction.atomic():
+                SafeMigration.objects.bulk_detect(
+                    [(migration.app_label, migration.name) for migration in migrations]
                 )
         except OperationalError:  # pragma: no cover
             pass  # The table doesn't exist yet
@@ -282,27 +263,33 @@ class Command(migrate.Command):
         declared: dict[Migration, Safe],
         resolved: dict[Migration, When],
         detected: dict[Migration, timezone.datetime],
+        now: timezone.datetime,
     ):
         """Display delayed migrations."""
+        now = timezone.localtime(now)
         self.stdout.write(self.style.MIGRATE_HEADING("Delayed migrations:"))
+        lines = []
         for migration in migrations:
             if (
                 resolved[migration] == When.AFTER_DEPLOY
                 and declared[migration].delay is not None
             ):
-                now = timezone.localtime()
                 migrate_date = detected.get(migration, now) + declared[migration].delay
                 humanized_date = timeuntil(migrate_date, now=now, depth=2)
-                self.stdout.write(
+                lines.append(
                     f"  {migration.app_label}.{migration.name} "
                     f"(can automatically migrate in {humanized_date} "
                     f"- {migrate_date.isoformat()})"
                 )
             else:
-                self.stdout.write(f"  {migration.app_label}.{migration.name}")
+                lines.append(f"  {migration.app_label}.{migration.name}")
+        self.stdout.write("\n".join(lines))
 
     def write_blocked(self, migrations: list[Migration]):
         """Display blocked migrations."""
         self.stdout.write(self.style.MIGRATE_HEADING("Blocked migrations:"))
-        for migration in migrations:
-            self.stdout.write(f"  {migration.app_label}.{migration.name}")
+        self.stdout.write(
+            "\n".join(
+                f"  {migration.app_label}.{migration.name}" for migration in migrations
+            )
+        )
@@ -0,0 +1,52 @@
+"""The configured mode of operation for safemigrate."""
+
+from __future__ import annotations
+
+from enum import Enum
+import warnings
+
+from django.conf import settings
+
+NONE_DEPRECATED_MESSAGE = "Setting the SAFEMIGRATE setting to None is deprecated."
+NONE_DEPRECATED_HINT = "Use 'strict' instead, or remove the setting to use the default."
+
+
+class Mode(Enum):
+    """The mode of operation for safemigrate.
+
+    STRICT, the default mode, will throw an error if migrations
+    marked Safe.before_deploy() are blocked by unrun migrations that
+    are marked Safe.after_deploy() with an unfulfilled delay.
+
+    NONSTRICT will run the same migrations as strict mode, but will
+    not throw an error if migrations are blocked.
+
+    DISABLED will completely bypass safemigrate protections and run
+    exactly the same as the standard migrate command.
+    """
+
+    STRICT = "strict"
+    NONSTRICT = "nonstrict"
+    DISABLED = "disabled"
+
+
+def get_mode() -> Mode:
+    """Determine the configured mode of operation for safemigrate."""
+    mode = getattr(settings, "SAFEMIGRATE", "strict")
+    if mode is None:
+        warnings.warn(
+            f"{NONE_DEPRECATED_MESSAGE} {NONE_DEPRECATED_HINT}", DeprecationWarning
+        )
+        mode = "strict"
+    if not isinstance(mode, str):
+        raise ValueError(
+            "The SAFEMIGRATE setting must be a string."
+            " It must be one of 'strict', 'nonstrict', or 'disabled'."
+        )
+    try:
+        return Mode(mode.lower())
+    except ValueError:
+        raise ValueError(
+            "The SAFEMIGRATE setting is invalid."
+            " It must be one of 'strict', 'nonstrict', or 'disabled'."
+        )
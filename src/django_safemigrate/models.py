@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from django.db import models
-from django.db.models.functions import Concat
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -10,18 +9,30 @@ class SafeMigrationManager(models.Manager):
     def get_detected_map(
         self, app_model_pairs: list[tuple[str, str]]
     ) -> dict[tuple[str, str], timezone.datetime]:
-        detection_qs = (
-            self.get_queryset()
-            .annotate(
-                identifer=Concat(models.F("app"), models.Value("."), models.F("name"))
-            )
-            .filter(identifer__in=[".".join(pair) for pair in app_model_pairs])
-        )
+        # Narrow with indexable IN lookups on each column,
+        # then discard any cross-matched pairs in Python.
+        pairs = set(app_model_pairs)
+        detection_qs = self.filter(
+            app__in={app for app, _ in pairs}, name__in={name for _, name in pairs}
+        ).values_list("app", "name", "detected")
         detected_map = {
-            (obj.app, obj.name): obj.detected for obj in detection_qs.iterator()
+            (app, name): detected
+            for app, name, detected in detection_qs.iterator()
+            if (app, name) in pairs
         }
         return detected_map
 
+    def bulk_detect(self, app_model_pairs: list[tuple[str, str]]):
+        """Mark the given migrations as detected if they aren't already.
+
+        Existing rows are left untouched so their detection time is kept.
+        """
+        self.bulk_create(
+            [self.model(app=app, name=name) for app, name in app_model_pairs],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+
 
 class SafeMigration(models.Model):
     class Meta:
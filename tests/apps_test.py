@@ -0,0 +1,21 @@
+from django_safemigrate.apps import check_mode
+
+
+class TestCheckMode:
+    def test_valid(self, settings):
+        """The system check passes for a valid SAFEMIGRATE setting."""
+        settings.SAFEMIGRATE = "nonstrict"
+        assert check_mode(None) == []
+
+    def test_invalid(self, settings):
+        """The system check reports an invalid SAFEMIGRATE setting."""
+        settings.SAFEMIGRATE = "invalid"
+        errors = check_mode(None)
+        assert [error.id for error in errors] == ["django_safemigrate.E001"]
+
+    def test_none(self, settings, recwarn):
+        """The system check warns about ``None`` without a runtime warning."""
+        settings.SAFEMIGRATE = None
+        errors = check_mode(None)
+        assert [error.id for error in errors] == ["django_safemigrate.W001"]
+        assert not recwarn.list
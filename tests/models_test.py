@@ -23,3 +23,21 @@ class TestSafeMigrationManager:
 
         mapping = SafeMigration.objects.get_detected_map([("spam", "0001")])
         assert mapping == {("spam", "0001"): m1.detected}
+
+    def test_bulk_detect(self):
+        existing = SafeMigration.objects.create(
+            app="spam", name="0001", detected=timezone.now() - timedelta(days=1)
+        )
+        SafeMigration.objects.bulk_detect([("spam", "0001"), ("spam", "0002")])
+        assert SafeMigration.objects.count() == 2
+        existing.refresh_from_db()
+        assert existing.detected < timezone.now() - timedelta(hours=23)
+
+    def test_get_detected_map_cross_match(self):
+        m1 = SafeMigration.objects.create(app="spam", name="0001")
+        SafeMigration.objects.create(app="spam", name="0002")
+        SafeMigration.objects.create(app="eggs", name="0001")
+        mapping = SafeMigration.objects.get_detected_map(
+            [("spam", "0001"), ("eggs", "0002")]
+        )
+        assert mapping == {("spam", "0001"): m1.detected}
@@ -74,6 +74,16 @@ class TestSafeMigrate:
         receiver(plan=plan)
         assert len(plan) == 2
 
+    def test_empty_plan(self, mocker, receiver):
+        """An empty plan needs no work."""
+        detected = mocker.patch.object(Command, "detected")
+        categorize = mocker.patch.object(Command, "categorize")
+        plan = []
+        receiver(plan=plan)
+        assert plan == []
+        detected.assert_not_called()
+        categorize.assert_not_called()
+
     def test_backward(self, receiver):
         """It should fail to run backward."""
         plan = [(Migration(), True)]
@@ -92,6 +102,16 @@ class TestSafeMigrate:
         receiver(plan=plan)
         assert len(plan) == 2
 
+    def test_no_delays_no_queries(self, receiver, django_assert_num_queries):
+        """Detection is only queried for after_deploy migrations with a delay."""
+        plan = [
+            (Migration("spam", "0001_initial", safe=Safe.before_deploy()), False),
+            (Migration("eggs", "0001_initial", safe=Safe.after_deploy()), False),
+        ]
+        with django_assert_num_queries(0):
+            receiver(plan=plan)
+        assert len(plan) == 1
+
     def test_all_before(self, receiver):
         """Before migrations will remain in the plan."""
         plan = [(Migration(safe=Safe.before_deploy()), False)]
@@ -368,6 +388,80 @@ class TestSafeMigrate:
         with pytest.raises(CommandError):
             receiver(plan=plan)
 
+    def test_blocked_transitively(self):
+        """Migrations behind a blocked migration are also blocked."""
+        plan = [
+            (Migration("spam", "0001_initial", safe=Safe.after_deploy()), False),
+            (
+                Migration(
+                    "spam",
+                    "0002_safety",
+                    safe=Safe.before_deploy(),
+                    dependencies=[("spam", "0001_initial")],
+                ),
+                False,
+            ),
+            (
+                Migration(
+                    "spam",
+                    "0003_always",
+                    safe=Safe.always(),
+                    dependencies=[("spam", "0002_safety")],
+                    run_before=[("eggs", "0001_initial")],
+                ),
+                False,
+            ),
+            (Migration("eggs", "0001_initial", safe=Safe.after_deploy()), False),
+            (Migration("ham", "0001_initial", safe=Safe.before_deploy()), False),
+        ]
+        out = StringIO()
+        receiver = Command(stdout=out).pre_migrate_receiver
+        with pytest.raises(CommandError):
+            receiver(plan=plan)
+        assert out.getvalue().strip().split("\n") == [
+            "Delayed migrations:",
+            "  spam.0001_initial",
+            "Blocked migrations:",
+            "  spam.0002_safety",
+            "  spam.0003_always",
+            "  eggs.0001_initial",
+        ]
+
+    def test_delayed_then_blocked(self):
+        """A delayed migration is blocked if also behind a blocked migration."""
+        plan = [
+            (Migration("spam", "0001_initial", safe=Safe.after_deploy()), False),
+            (
+                Migration(
+                    "spam",
+                    "0002_safety",
+                    safe=Safe.before_deploy(),
+                    dependencies=[("spam", "0001_initial")],
+                ),
+                False,
+            ),
+            (
+                Migration(
+                    "eggs",
+                    "0001_initial",
+                    safe=Safe.always(),
+                    dependencies=[("spam", "0001_initial"), ("spam", "0002_safety")],
+                ),
+                False,
+            ),
+        ]
+        out = StringIO()
+        receiver = Command(stdout=out).pre_migrate_receiver
+        with pytest.raises(CommandError):
+            receiver(plan=plan)
+        assert out.getvalue().strip().split("\n") == [
+            "Delayed migrations:",
+            "  spam.0001_initial",
+            "Blocked migrations:",
+            "  spam.0002_safety",
+            "  eggs.0001_initial",
+        ]
+
     def test_consecutive_after(self, receiver):
         """Consecutive after migrations are ok."""
         plan = [